@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""Benchmark result encodings: text table vs columnar payloads
+
+Compares payload size and encode/decode time of the execute_query output
+formats on synthetic rows. No database connection is needed.
+
+Usage:
+    python benchmark_encoding.py [row_count ...]
+"""
+
+import sys
+import time
+import uuid
+import datetime
+import decimal
+
+from mcp_server import format_table
+from result_codec import encode_result, decode_result
+
+COLUMNS = ["id", "customer_id", "status", "amount", "ratio", "created_at", "order_uuid", "note"]
+TYPES = ["int", "int", "text", "numeric", "float", "timestamptz", "uuid", "text"]
+STATUSES = ["pending", "shipped", "delivered", "cancelled"]
+
+def make_rows(count: int) -> list:
+    """Generate rows resembling a typical orders table"""
+    base = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+    return [
+        (
+            i,
+            i % 9973,
+            STATUSES[i % len(STATUSES)],
+            decimal.Decimal(f"{(i * 37) % 100000 / 100:.2f}"),
+            (i % 1000) / 1000,
+            base + datetime.timedelta(seconds=i * 61),
+            uuid.UUID(int=i * 2654435761),
+            None if i % 3 else f"note {i}",
+        )
+        for i in range(count)
+    ]
+
+def encode_text(rows: list) -> str:
+    """Encode rows the way execute_query does for output_format='text'"""
+    lines = [f"Query returned {len(rows)} rows:"]
+    lines.extend(format_table(COLUMNS, rows))
+    return "\n".join(lines)
+
+def timed(func, *args, repeat: int = 5, **kwargs):
+    """Return the best time of several runs and the last result"""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func(*args, **kwargs)
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+def main():
+    """Run the benchmark for each requested row count"""
+    row_counts = [int(arg) for arg in sys.argv[1:]] or [100, 10000, 100000]
+
+    print(f"{'rows':>8} | {'format':<20} | {'size (bytes)':>12} | {'vs text':>7} | {'encode ms':>9} | {'decode ms':>9}")
+    print("-" * 82)
+
+    for count in row_counts:
+        rows = make_rows(count)
+        text_time, text = timed(encode_text, rows)
+        text_size = len(text.encode("utf-8"))
+        print(f"{count:>8} | {'text':<20} | {text_size:>12,} | {'100%':>7} | {text_time*1000:>9.1f} | {'-':>9}")
+
+        result = {"success": True, "type": "select", "columns": COLUMNS, "types": TYPES,
+                  "rows": rows, "row_count": len(rows)}
+        for name, compress in (("columnar", False), ("columnar_compressed", True)):
+            encode_time, payload = timed(encode_result, result, compress=compress)
+            decode_time, decoded = timed(decode_result, payload)
+            assert decoded["rows"] == rows, f"{name} round trip mismatch"
+            size = len(payload.encode("utf-8"))
+            print(f"{count:>8} | {name:<20} | {size:>12,} | {size/text_size:>7.0%} | "
+                  f"{encode_time*1000:>9.1f} | {decode_time*1000:>9.1f}")
+
+if __name__ == "__main__":
+    main()
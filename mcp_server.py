@@ -2,13 +2,21 @@
 """PostgreSQL MCP Server"""
 
 import os
+import re
 import logging
+import random
+import itertools
 import subprocess
 import time
 import socket
+import threading
 from typing import Dict, Any
-import psycopg2
-from fastmcp import FastMCP
+
+# Measures the fastmcp import and tool registration up to main();
+# psycopg2 and result_codec are imported on first use
+MODULE_LOAD_STARTED = time.perf_counter()
+
+from fastmcp import FastMCP, Context
 
 # Logging setup
 def setup_logger(name: str, log_file: str = "pg_mcp.log"):
@@ -54,8 +62,11 @@ def setup_logger(name: str, log_file: str = "pg_mcp.log"):
     
     return logger
 
-# 안전한 디폴트 로그 파일 경로 사용
-logger = setup_logger("pg_mcp", os.getenv('LOG_FILE', './pg_mcp.log'))
+# 핸들러 설정(파일 생성 포함)은 main()에서 수행하여 import 시 파일 시스템 작업을 피함
+logger = logging.getLogger("pg_mcp")
+
+# Serializes tunnel startup between warmup and query threads
+_bastion_lock = threading.Lock()
 
 # Bastion management functions
 def is_port_open(host: str = "localhost", port: int = 10000) -> bool:
@@ -146,9 +157,9 @@ def start_bastion() -> bool:
             start_new_session=True  # Independent process group
         )
         
-        # Wait for connection to establish
-        for i in range(15):  # Increased timeout to 15 seconds
-            time.sleep(1)
+        # Wait for connection to establish (poll every 0.5s so recovery is quick)
+        for i in range(30):  # 15 seconds in total
+            time.sleep(0.5)
             if is_port_open():
                 logger.info("Bastion connection established successfully")
                 logger.info("Note: Bastion will continue running independently when MCP server stops")
@@ -164,7 +175,7 @@ def start_bastion() -> bool:
                     logger.debug(f"Bastion stdout: {stdout.decode().strip()}")
                 return False
                 
-            logger.debug(f"Waiting for bastion connection... ({i+1}/15)")
+            logger.debug(f"Waiting for bastion connection... ({i+1}/30)")
                 
         logger.error("Bastion connection failed to establish within 15 seconds")
         
@@ -183,9 +194,13 @@ def ensure_bastion_connection() -> bool:
     if is_port_open():
         logger.info("Bastion connection already active (running independently)")
         return True
-        
-    logger.info("Bastion connection not detected, attempting to start...")
-    return start_bastion()
+    
+    with _bastion_lock:
+        # Another thread may have started the tunnel while we waited
+        if is_port_open():
+            return True
+        logger.info("Bastion connection not detected, attempting to start...")
+        return start_bastion()
 
 # PostgreSQL execution functions
 def get_connection_params() -> Dict[str, str]:
@@ -198,99 +213,662 @@ def get_connection_params() -> Dict[str, str]:
         'database': os.getenv('PGDATABASE', 'postgres')
     }
 
+# Retry settings for transient failures (tunnel drops, server restarts, ...)
+# Connection-class errors leave the connection unusable; the rest only abort the transaction
+CONNECTION_PGCODE_PREFIXES = ('08', '57P')    # connection exceptions, admin/crash shutdown
+TRANSACTION_PGCODES = {'40001', '40P01'}      # serialization failure, deadlock detected
+CONNECTION_MESSAGES = (
+    'connection reset',
+    'server closed the connection',
+    'connection already closed',
+    'connection refused',
+    'could not connect to server',
+    'terminating connection',
+    'ssl connection has been closed',
+    'no connection to the server',
+    'broken pipe',
+    'timeout expired',
+)
+READ_ONLY_VIOLATION = '25006'  # read_only_sql_transaction
+WRITE_KEYWORDS = re.compile(
+    r'\b(INSERT|UPDATE|DELETE|MERGE|CREATE|DROP|ALTER|TRUNCATE|GRANT|REVOKE|COPY|CALL|DO|LOCK|VACUUM|REINDEX|CLUSTER|REFRESH|ANALYZE|INTO)\b',
+    re.IGNORECASE,
+)
+
+def get_retry_settings() -> Dict[str, float]:
+    """Get retry parameters for transient errors"""
+    return {
+        'max_retries': int(os.getenv('PG_RETRY_MAX', '3')),
+        'base_delay': float(os.getenv('PG_RETRY_BASE_DELAY', '0.2')),
+        'max_delay': float(os.getenv('PG_RETRY_MAX_DELAY', '2.0')),
+    }
+
+def get_backoff_delay(attempt: int, base_delay: float, max_delay: float) -> float:
+    """Exponential backoff with full jitter"""
+    return random.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
+
+def is_connection_error(error: Exception) -> bool:
+    """Check whether an error means the connection (or tunnel) is gone
+
+    Used where no connection object is available to check (connect and
+    checkout failures); mid-statement losses are detected via conn.closed.
+    """
+    import psycopg2
+    if not isinstance(error, (psycopg2.OperationalError, psycopg2.InterfaceError)):
+        return False
+    pgcode = getattr(error, 'pgcode', None)
+    if pgcode:
+        return pgcode.startswith(CONNECTION_PGCODE_PREFIXES)
+    message = str(error).lower()
+    return any(msg in message for msg in CONNECTION_MESSAGES)
+
+def is_transient_error(error: Exception) -> bool:
+    """Check whether an error is likely to succeed on retry"""
+    return getattr(error, 'pgcode', None) in TRANSACTION_PGCODES or is_connection_error(error)
+
+def is_read_only_query(query: str) -> bool:
+    """Check whether a query looks read-only (enforced by running it read-only)"""
+    query_upper = query.strip().upper()
+    if not query_upper.startswith(('SELECT', 'WITH', 'SHOW', 'EXPLAIN', 'TABLE', 'VALUES')):
+        return False
+    # Data-modifying CTEs, SELECT ... INTO and EXPLAIN ANALYZE of writes are not safe
+    return not WRITE_KEYWORDS.search(query)
+
+# Connection pool shared by all tool calls
+_pool = None
+_pool_lock = threading.Lock()
+# Bumped on connection errors; connections opened in an older generation are
+# discarded when next checked out or returned, never while in use
+_pool_generation = 0
+_conn_generations: Dict[int, int] = {}
+
+def get_pool_settings() -> Dict[str, int]:
+    """Get connection pool size limits"""
+    return {
+        'minconn': int(os.getenv('PG_POOL_MIN', '1')),
+        'maxconn': int(os.getenv('PG_POOL_MAX', '10')),
+    }
+
+def get_pool():
+    """Get the shared connection pool, creating it on first use"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            import psycopg2.pool
+            settings = get_pool_settings()
+            _pool = psycopg2.pool.ThreadedConnectionPool(settings['minconn'], settings['maxconn'], **get_connection_params())
+            logger.info(f"Connection pool created ({settings['minconn']}-{settings['maxconn']} connections)")
+        return _pool
+
+def is_stale_connection(conn) -> bool:
+    """Check whether a connection predates the last connection failure"""
+    with _pool_lock:
+        return _conn_generations.setdefault(id(conn), _pool_generation) < _pool_generation
+
+def get_connection(pool):
+    """Check out a pooled connection, discarding closed or stale ones"""
+    while True:
+        conn = pool.getconn()
+        if not conn.closed and not is_stale_connection(conn):
+            return conn
+        release_connection(pool, conn, close=True)
+
+def release_connection(pool, conn, close: bool = False) -> None:
+    """Return a connection to the pool, discarding it if broken or stale"""
+    close = close or bool(conn.closed) or is_stale_connection(conn)
+    pool.putconn(conn, close=close)
+    if conn.closed:
+        # The pool also closes connections beyond minconn on return
+        with _pool_lock:
+            _conn_generations.pop(id(conn), None)
+
+def invalidate_connections() -> None:
+    """Mark every existing connection stale after a connection failure"""
+    global _pool_generation
+    with _pool_lock:
+        _pool_generation += 1
+
+def recover_connection() -> bool:
+    """Drop stale pooled connections and re-establish the bastion tunnel"""
+    invalidate_connections()
+    if is_port_open():
+        return True
+    logger.warning("Bastion tunnel is down, restarting...")
+    return ensure_bastion_connection()
+
 def get_operation_type(query: str) -> str:
     """Get operation type from query"""
     ops = {'INSERT': 'Insert', 'UPDATE': 'Update', 'DELETE': 'Delete', 'CREATE': 'Create', 'DROP': 'Drop', 'ALTER': 'Alter'}
     return next((op for kw, op in ops.items() if query.startswith(kw)), 'Execute')
 
-def execute_postgresql_query(query: str) -> Dict[str, Any]:
-    """Execute PostgreSQL query and return results"""
-    SELECT_KEYWORDS = ['SELECT', 'WITH', 'SHOW', 'DESCRIBE', 'EXPLAIN']
+# Admission control: global concurrency cap, per-client rate limits and priority classes
+PRIORITY_CATALOG = 0
+PRIORITY_ANALYTICAL = 1
+CATALOG_PATTERN = re.compile(
+    r'\b(pg_catalog|information_schema|pg_class|pg_namespace|pg_attribute|pg_index|pg_indexes|'
+    r'pg_stats|pg_stat_\w+|pg_tables|pg_views|pg_settings|pg_roles|pg_database)\b',
+    re.IGNORECASE,
+)
+
+_scheduler_cond = threading.Condition()
+_running = 0
+_waiting = []  # (priority, sequence) tickets waiting for a slot
+_ticket_seq = itertools.count()
+_buckets: Dict[tuple, Dict[str, float]] = {}
+
+def get_scheduler_settings() -> Dict[str, float]:
+    """Get concurrency, rate limit and queue timeout settings"""
+    return {
+        # Never admit more queries than the pool can serve
+        'max_concurrency': min(int(os.getenv('PG_MAX_CONCURRENCY', '5')), get_pool_settings()['maxconn']),
+        'rate': float(os.getenv('PG_RATE_LIMIT', '5')),
+        'burst': float(os.getenv('PG_RATE_BURST', '20')),
+        'queue_timeout': float(os.getenv('PG_QUEUE_TIMEOUT', '30')),
+    }
+
+def get_target() -> str:
+    """Get the database target used to key rate limits"""
+    params = get_connection_params()
+    return f"{params['host']}:{params['port']}/{params['database']}"
+
+def get_query_priority(query: str) -> int:
+    """Catalog lookups are scheduled ahead of analytical queries"""
+    if query.strip().upper().startswith('SHOW') or CATALOG_PATTERN.search(query):
+        return PRIORITY_CATALOG
+    return PRIORITY_ANALYTICAL
+
+def prune_buckets(now: float, rate: float, burst: float) -> None:
+    """Drop buckets idle long enough to be full again; they would be recreated identical"""
+    for key, bucket in list(_buckets.items()):
+        if bucket["tokens"] + (now - bucket["updated"]) * rate >= burst:
+            del _buckets[key]
+
+def reserve_token(key: tuple, rate: float, burst: float) -> float:
+    """Take a token from the client's bucket, returning how long to wait for it"""
+    now = time.monotonic()
+    prune_buckets(now, rate, burst)
+    bucket = _buckets.setdefault(key, {"tokens": burst, "updated": now})
+    bucket["tokens"] = min(burst, bucket["tokens"] + (now - bucket["updated"]) * rate)
+    bucket["updated"] = now
+    bucket["tokens"] -= 1
+    return max(0.0, -bucket["tokens"] / rate)
+
+def acquire_slot(client_id: str, priority: int) -> Dict[str, Any]:
+    """Wait for the client's rate limit and a free concurrency slot"""
+    global _running
+    settings = get_scheduler_settings()
+    started = time.monotonic()
+    deadline = started + settings['queue_timeout']
+    
+    # Per-client/per-target token bucket; waiting here does not block other clients
+    if settings['rate'] > 0:
+        key = (client_id, get_target())
+        with _scheduler_cond:
+            wait = reserve_token(key, settings['rate'], settings['burst'])
+            if wait > settings['queue_timeout']:
+                _buckets[key]["tokens"] += 1
+                return {"admitted": False, "queue_time": 0.0,
+                        "error": f"Rate limit exceeded for client '{client_id}', retry in {wait:.1f}s"}
+        if wait:
+            time.sleep(wait)
+    
+    # Global concurrency cap, lowest (priority, arrival) first
+    ticket = (priority, next(_ticket_seq))
+    with _scheduler_cond:
+        _waiting.append(ticket)
+        try:
+            while _running >= settings['max_concurrency'] or min(_waiting) != ticket:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return {"admitted": False, "queue_time": time.monotonic() - started,
+                            "error": f"Query queue timeout after {settings['queue_timeout']:.0f}s "
+                                     f"({_running} running, {len(_waiting)} waiting)"}
+                _scheduler_cond.wait(remaining)
+            _running += 1
+        finally:
+            _waiting.remove(ticket)
+            _scheduler_cond.notify_all()
     
+    return {"admitted": True, "queue_time": time.monotonic() - started}
+
+def release_slot() -> None:
+    """Free a concurrency slot and wake waiting queries"""
+    global _running
+    with _scheduler_cond:
+        _running -= 1
+        _scheduler_cond.notify_all()
+
+def execute_postgresql_query(query: str, idempotent: bool = False, params: tuple = None,
+                             client_id: str = "default", priority: int = None) -> Dict[str, Any]:
+    """Execute PostgreSQL query through the scheduler and return results"""
     if not query.strip():
         return {"success": False, "error": "Empty query"}
     
+    if priority is None:
+        priority = get_query_priority(query)
+    
+    admission = acquire_slot(client_id, priority)
+    if not admission["admitted"]:
+        logger.warning(f"Query rejected by scheduler: {admission['error']}")
+        return {"success": False, "error": admission["error"], "queue_time": admission["queue_time"]}
+    if admission["queue_time"] >= 0.01:
+        logger.info(f"Query queued for {admission['queue_time']:.2f}s (client: {client_id}, priority: {priority})")
+    
+    try:
+        result = run_postgresql_query(query, idempotent, params)
+    finally:
+        release_slot()
+    
+    result["queue_time"] = admission["queue_time"]
+    return result
+
+def run_postgresql_query(query: str, idempotent: bool = False, params: tuple = None) -> Dict[str, Any]:
+    """Execute PostgreSQL query and return results
+
+    Transient failures are retried with jittered backoff when the query is
+    read-only or marked idempotent. Other statements are only retried when
+    they failed before being sent to the server.
+    """
+    import psycopg2
+    from result_codec import get_column_type
+    
+    SELECT_KEYWORDS = ['SELECT', 'WITH', 'SHOW', 'DESCRIBE', 'EXPLAIN']
+    
     # Ensure bastion connection before executing query
     if not ensure_bastion_connection():
         return {"success": False, "error": "Failed to establish bastion connection"}
     
     logger.info(f"Executing query: {query[:100]}...")
     
+    retry = get_retry_settings()
+    # The keyword check misses writes hidden in functions (nextval, setval, ...),
+    # so queries retried because of it run in a read-only transaction
+    read_only = not idempotent and is_read_only_query(query)
+    retryable = idempotent or read_only
+    attempt = 0
+    
+    while True:
+        statement_sent = False
+        broken = False
+        pool = conn = None
+        try:
+            pool = get_pool()
+            conn = get_connection(pool)
+            with conn:
+                with conn.cursor() as cur:
+                    if read_only:
+                        cur.execute("SET TRANSACTION READ ONLY")
+                    elif not retryable:
+                        # Validate the pooled connection so writes are never sent over a dead socket
+                        cur.execute("SELECT 1")
+                    statement_sent = True
+                    cur.execute(query, params)
+                    
+                    if any(query.strip().upper().startswith(kw) for kw in SELECT_KEYWORDS):
+                        try:
+                            rows = cur.fetchall()
+                            columns = [desc[0] for desc in cur.description] if cur.description else []
+                            types = [get_column_type(desc[1]) for desc in cur.description] if cur.description else []
+                            result = {"success": True, "type": "select", "columns": columns, "types": types, "rows": rows, "row_count": len(rows)}
+                        except psycopg2.ProgrammingError:
+                            result = {"success": True, "type": "select_no_result", "message": "Query executed successfully (no results)"}
+                    else:
+                        conn.commit()
+                        operation = get_operation_type(query.strip().upper())
+                        result = {
+                            "success": True, 
+                            "type": "modify", 
+                            "affected_rows": cur.rowcount,
+                            "operation": operation,
+                            "message": f"{operation} completed: {cur.rowcount} rows affected"
+                        }
+                    
+            result["attempts"] = attempt + 1
+            logger.info(f"Execution successful: {result['type']}")
+            return result
+                    
+        except Exception as e:
+            # psycopg2 sets conn.closed to 2 when the connection is lost mid-statement
+            lost = conn is not None and bool(conn.closed)
+            if lost and isinstance(e, psycopg2.InterfaceError) and e.__context__ is not None:
+                # "with conn:" tried to roll back on the lost connection; report what actually failed
+                e = e.__context__
+            
+            if read_only and getattr(e, 'pgcode', None) == READ_ONLY_VIOLATION:
+                # Rejected before changing anything; run it normally, without automatic retries
+                logger.info("Query writes despite its read-only form, running it without automatic retries")
+                read_only = retryable = False
+                continue
+            
+            # Serialization failures and deadlocks leave the connection usable
+            broken = lost or is_connection_error(e)
+            transient = broken or is_transient_error(e)
+            if transient and (retryable or not statement_sent) and attempt < retry['max_retries']:
+                delay = get_backoff_delay(attempt, retry['base_delay'], retry['max_delay'])
+                logger.warning(f"Transient error (attempt {attempt+1}/{retry['max_retries']+1}), "
+                               f"retrying in {delay:.2f}s: {str(e).strip()}")
+                if conn is not None:
+                    release_connection(pool, conn, close=broken)
+                    conn = None
+                attempt += 1
+                time.sleep(delay)
+                if broken:
+                    recover_connection()
+                continue
+            
+            error_msg = f"Execution failed: {str(e).strip()}"
+            if transient and statement_sent and not retryable:
+                error_msg += " (not retried: statement may have modified data; pass idempotent=True if it is safe to repeat)"
+            logger.error(error_msg)
+            return {"success": False, "error": error_msg, "transient": transient}
+        
+        finally:
+            if conn is not None:
+                release_connection(pool, conn, close=broken)
+
+# Startup warmup
+def warmup(timings: Dict[str, float]) -> None:
+    """Establish tunnel and prewarm the pool in the background"""
+    def timed(stage, func):
+        started = time.perf_counter()
+        try:
+            return func()
+        finally:
+            timings[stage] = time.perf_counter() - started
+    
     try:
-        conn_params = get_connection_params()
-        with psycopg2.connect(**conn_params) as conn:
-            with conn.cursor() as cur:
-                cur.execute(query)
-                
-                if any(query.strip().upper().startswith(kw) for kw in SELECT_KEYWORDS):
-                    try:
-                        rows = cur.fetchall()
-                        columns = [desc[0] for desc in cur.description] if cur.description else []
-                        result = {"success": True, "type": "select", "columns": columns, "rows": rows, "row_count": len(rows)}
-                    except psycopg2.ProgrammingError:
-                        result = {"success": True, "type": "select_no_result", "message": "Query executed successfully (no results)"}
-                else:
-                    conn.commit()
-                    operation = get_operation_type(query.strip().upper())
-                    result = {
-                        "success": True, 
-                        "type": "modify", 
-                        "affected_rows": cur.rowcount,
-                        "operation": operation,
-                        "message": f"{operation} completed: {cur.rowcount} rows affected"
-                    }
-                
-                logger.info(f"Execution successful: {result['type']}")
-                return result
-                
+        if not timed('tunnel', ensure_bastion_connection):
+            logger.warning("Warmup: bastion connection not available, will retry on first query")
+            return
+        timed('pool', get_pool)
     except Exception as e:
-        error_msg = f"Execution failed: {str(e)}"
-        logger.error(error_msg)
-        return {"success": False, "error": error_msg}
+        logger.warning(f"Warmup failed, connections will be opened on first query: {e}")
+    finally:
+        logger.info("Startup timing: " + ", ".join(f"{stage} {sec*1000:.0f}ms" for stage, sec in timings.items()))
+
+# Table profiling
+# Profiles are cached per (table, sample size) until the table is re-analyzed
+_profile_cache: Dict[Any, Dict[str, Any]] = {}
+
+# Partitioned tables and inheritance parents hold little or no data themselves,
+# so row estimates and sizes are summed over the whole inheritance tree
+TABLE_META_QUERY = """
+    WITH RECURSIVE tree AS (
+        SELECT to_regclass(%s)::oid AS relid
+        UNION ALL
+        SELECT i.inhrelid FROM pg_inherits i JOIN tree t ON i.inhparent = t.relid
+    ), totals AS (
+        SELECT sum(greatest(tc.reltuples, 0))::bigint AS reltuples, sum(tc.relpages)::bigint AS relpages,
+               sum(pg_total_relation_size(tc.oid)) AS total_size, sum(pg_relation_size(tc.oid)) AS heap_size
+        FROM tree JOIN pg_class tc ON tc.oid = tree.relid
+    )
+    SELECT c.oid, format('%%I.%%I', n.nspname, c.relname), n.nspname, c.relname, c.relkind,
+           CASE WHEN c.relhassubclass THEN totals.reltuples ELSE c.reltuples::bigint END,
+           totals.relpages,
+           pg_size_pretty(totals.total_size), pg_size_pretty(totals.heap_size),
+           greatest(s.last_analyze, s.last_autoanalyze)::text
+    FROM pg_class c
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    CROSS JOIN totals
+    LEFT JOIN pg_stat_all_tables s ON s.relid = c.oid
+    WHERE c.oid = (SELECT relid FROM tree LIMIT 1)
+"""
+
+COLUMN_STATS_QUERY = """
+    SELECT a.attname, format_type(a.atttypid, a.atttypmod),
+           s.null_frac, s.n_distinct, s.avg_width, s.correlation,
+           s.most_common_vals::text::text[], s.most_common_freqs,
+           s.histogram_bounds::text::text[]
+    FROM pg_attribute a
+    JOIN pg_class c ON c.oid = a.attrelid
+    -- Tables with children get the row covering them too (partitioned tables
+    -- only have that one); the parent-only row describes a usually empty table
+    LEFT JOIN pg_stats s
+           ON s.schemaname = %s AND s.tablename = %s AND s.attname = a.attname
+          AND s.inherited = c.relhassubclass
+    WHERE a.attrelid = %s AND a.attnum > 0 AND NOT a.attisdropped
+    ORDER BY a.attnum
+"""
+
+def get_sample_percent(reltuples: int, sample_rows: int) -> float:
+    """Pick a TABLESAMPLE SYSTEM percentage that yields roughly sample_rows rows"""
+    if reltuples <= 0:
+        # Never analyzed: size unknown, let LIMIT bound the read
+        return 100.0
+    # Oversample 4x since SYSTEM sampling picks whole pages
+    return min(100.0, max(0.0001, sample_rows * 4 * 100.0 / reltuples))
+
+def summarize_column(row: tuple, reltuples: int) -> Dict[str, Any]:
+    """Turn a pg_stats row into a compact column summary"""
+    name, data_type, null_frac, n_distinct, avg_width, correlation, mcv, mcf, histogram = row
+    column = {"name": name, "type": data_type, "analyzed": null_frac is not None}
+    if null_frac is None:
+        return column
+    
+    # Negative n_distinct is a fraction of the row count
+    distinct = n_distinct if n_distinct >= 0 else -n_distinct * max(reltuples, 0)
+    column.update({
+        "null_frac": null_frac,
+        "distinct": int(round(distinct)),
+        "unique": n_distinct == -1,
+        "avg_width": avg_width,
+        "correlation": correlation,
+    })
+    if mcv:
+        column["most_common"] = list(zip(mcv, mcf))[:5]
+    if histogram:
+        # pg_stats leaves most common values out of the histogram, so these
+        # describe the remaining values only when the column has any
+        last = len(histogram) - 1
+        column["histogram"] = {
+            "min": histogram[0],
+            "p25": histogram[last // 4],
+            "median": histogram[last // 2],
+            "p75": histogram[last * 3 // 4],
+            "max": histogram[last],
+            "excludes_most_common": bool(mcv),
+        }
+    return column
+
+def profile_postgresql_table(table_name: str, sample_rows: int = 10, client_id: str = "default") -> Dict[str, Any]:
+    """Profile a table from planner statistics and a TABLESAMPLE preview"""
+    if not table_name.strip():
+        return {"success": False, "error": "Empty table name"}
+    sample_rows = max(0, min(sample_rows, 1000))
+    
+    meta = execute_postgresql_query(TABLE_META_QUERY, params=(table_name.strip(),), client_id=client_id)
+    # Time spent queued, summed over all scheduled queries
+    queue_time = meta.get("queue_time", 0.0)
+    if not meta["success"]:
+        return meta
+    if not meta["rows"]:
+        return {"success": False, "error": f"Table not found: {table_name}", "queue_time": queue_time}
+    
+    oid, qualified_name, schema, relname, relkind, reltuples, relpages, total_size, heap_size, last_analyzed = meta["rows"][0]
+    cache_key = (oid, sample_rows)
+    stats_version = (last_analyzed, reltuples, relpages)
+    
+    cached = _profile_cache.get(cache_key)
+    if cached and cached["stats_version"] == stats_version:
+        logger.info(f"Profile cache hit: {qualified_name}")
+        return dict(cached["profile"], cached=True, queue_time=queue_time)
+    
+    stats = execute_postgresql_query(COLUMN_STATS_QUERY, params=(schema, relname, oid), client_id=client_id)
+    queue_time += stats.get("queue_time", 0.0)
+    if not stats["success"]:
+        return dict(stats, queue_time=queue_time)
+    
+    profile = {
+        "success": True,
+        "table": qualified_name,
+        "kind": relkind,
+        "estimated_rows": reltuples,
+        "pages": relpages,
+        "total_size": total_size,
+        "heap_size": heap_size,
+        "last_analyzed": last_analyzed,
+        "columns": [summarize_column(row, reltuples) for row in stats["rows"]],
+        "cached": False,
+    }
+    
+    if sample_rows and relkind in ('r', 'm', 'p'):
+        percent = get_sample_percent(reltuples, sample_rows)
+        sample = execute_postgresql_query(
+            f"SELECT * FROM {qualified_name} TABLESAMPLE SYSTEM (%s) LIMIT %s",
+            params=(percent, sample_rows),
+            client_id=client_id,
+            priority=PRIORITY_CATALOG,
+        )
+        queue_time += sample.get("queue_time", 0.0)
+        if sample["success"]:
+            profile["sample"] = {"percent": percent, "columns": sample["columns"], "rows": sample["rows"]}
+        else:
+            profile["sample_error"] = sample["error"]
+    
+    _profile_cache[cache_key] = {"stats_version": stats_version, "profile": profile}
+    return dict(profile, queue_time=queue_time)
 
 # MCP Server setup
 mcp = FastMCP("PostgreSQL Server")
 
+def format_table(columns, rows) -> list:
+    """Format columns and rows as text table lines"""
+    lines = []
+    lines.append("-" * 50)
+    lines.append(" | ".join(columns))
+    lines.append("-" * 50)
+    
+    for row in rows:
+        lines.append(" | ".join(str(val) for val in row))
+    
+    return lines
+
+def get_client_id(ctx: Context) -> str:
+    """Identify the calling client for rate limiting
+
+    The server-assigned session id comes first: client_id is taken from
+    request metadata, which a client could change on every call.
+    """
+    try:
+        return ctx.session_id or ctx.client_id or "default"
+    except (AttributeError, RuntimeError):
+        return "default"
+
+OUTPUT_FORMATS = ("text", "columnar", "columnar_compressed")
+
 # Tool definition - must be after mcp instance creation
 @mcp.tool
-def execute_query(query: str) -> str:
+def execute_query(query: str, ctx: Context, idempotent: bool = False, output_format: str = "text") -> str:
     """Execute PostgreSQL query
     
     Args:
         query: SQL query string
+        idempotent: Set to True if the statement is safe to repeat, allowing
+            automatic retries after connection failures (read-only queries
+            are always retried)
+        output_format: "text" for a readable table, "columnar" for compact
+            JSON with a header (success, type, error, queue_time, column
+            schema) and one array per column, or "columnar_compressed" for
+            the same payload zlib-compressed and base64-encoded. In columnar
+            modes errors and non-select results are encoded too. Decode
+            columnar payloads with result_codec.decode_result.
         
     Returns:
         Query execution result as formatted string
     """
-    result = execute_postgresql_query(query)
+    if output_format not in OUTPUT_FORMATS:
+        return f"Error: Unknown output_format '{output_format}' (expected one of: {', '.join(OUTPUT_FORMATS)})"
+    
+    result = execute_postgresql_query(query, idempotent, client_id=get_client_id(ctx))
+    
+    if output_format != "text":
+        from result_codec import encode_result
+        # Machine consumers always get a payload, so errors decode like results
+        return encode_result(result, compress=output_format == "columnar_compressed")
+    
+    queued = f"\n(queued {result['queue_time']:.2f}s)" if result.get("queue_time", 0) >= 0.01 else ""
     
     if not result["success"]:
-        return f"Error: {result['error']}"
+        return f"Error: {result['error']}" + queued
     
     if result["type"] == "select":
         if result["row_count"] == 0:
-            return "Query executed successfully but returned no rows."
-        
-        # Format results as a table
-        lines = []
-        lines.append(f"Query returned {result['row_count']} rows:")
-        lines.append("-" * 50)
-        lines.append(" | ".join(result["columns"]))
-        lines.append("-" * 50)
+            return "Query executed successfully but returned no rows." + queued
         
-        for row in result["rows"]:
-            lines.append(" | ".join(str(val) for val in row))
-        
-        return "\n".join(lines)
+        lines = [f"Query returned {result['row_count']} rows:"]
+        lines.extend(format_table(result["columns"], result["rows"]))
+        return "\n".join(lines) + queued
     
     elif result["type"] == "modify":
-        return f"{result['operation']} completed successfully. {result['affected_rows']} rows affected."
+        return f"{result['operation']} completed successfully. {result['affected_rows']} rows affected." + queued
     
     else:
-        return result.get("message", "Query executed successfully.")
+        return result.get("message", "Query executed successfully.") + queued
+
+@mcp.tool
+def profile_table(table: str, ctx: Context, sample_rows: int = 10) -> str:
+    """Profile a table cheaply without scanning it
+    
+    Uses planner statistics (pg_class, pg_stats) for row counts, sizes,
+    null fractions, distinct counts, most common values and value ranges,
+    plus a small TABLESAMPLE SYSTEM preview. Prefer this over COUNT(*) or
+    SELECT * ... LIMIT on large tables.
+    
+    Args:
+        table: Table name, optionally schema-qualified (e.g. "public.orders")
+        sample_rows: Number of sample rows to preview (0 to skip, max 1000)
+        
+    Returns:
+        Table profile as formatted string
+    """
+    result = profile_postgresql_table(table, sample_rows, client_id=get_client_id(ctx))
+    queued = f"\n(queued {result['queue_time']:.2f}s)" if result.get("queue_time", 0) >= 0.01 else ""
+    
+    if not result["success"]:
+        return f"Error: {result['error']}" + queued
+    
+    rows = f"~{result['estimated_rows']:,} rows" if result["estimated_rows"] >= 0 else "row count unknown (never analyzed)"
+    lines = [
+        f"Table {result['table']}: {rows}, {result['total_size']} total ({result['heap_size']} heap), "
+        f"last analyzed: {result['last_analyzed'] or 'never'}" + (" [cached]" if result["cached"] else ""),
+        "",
+        "Columns:",
+    ]
+    
+    for col in result["columns"]:
+        if not col["analyzed"]:
+            lines.append(f"- {col['name']} ({col['type']}): no statistics (run ANALYZE)")
+            continue
+        
+        desc = f"- {col['name']} ({col['type']}): nulls {col['null_frac']:.1%}, "
+        desc += "unique" if col["unique"] else f"~{col['distinct']:,} distinct"
+        if "most_common" in col:
+            desc += "; top: " + ", ".join(f"{val} {freq:.1%}" for val, freq in col["most_common"])
+        if "histogram" in col:
+            hist = col["histogram"]
+            label = "other values" if hist["excludes_most_common"] else "values"
+            desc += (f"; {label} {hist['min']} .. {hist['max']}, "
+                     f"quartiles {hist['p25']} / {hist['median']} / {hist['p75']}")
+        lines.append(desc)
+    
+    if "sample" in result:
+        sample = result["sample"]
+        lines.append("")
+        lines.append(f"Sample ({len(sample['rows'])} rows, TABLESAMPLE SYSTEM {sample['percent']:.4g}%):")
+        lines.extend(format_table(sample["columns"], sample["rows"]))
+    elif "sample_error" in result:
+        lines.append("")
+        lines.append(f"Sample unavailable: {result['sample_error']}")
+    
+    return "\n".join(lines) + queued
 
 def main():
     """Main function to run MCP server"""
+    timings = {'module_load': time.perf_counter() - MODULE_LOAD_STARTED}
+    started = time.perf_counter()
+    setup_logger("pg_mcp", os.getenv('LOG_FILE', './pg_mcp.log'))
+    timings['logger'] = time.perf_counter() - started
+    
     logger.info("MCP server initialized")
     logger.info(f"Server name: {mcp.name}")
     
@@ -302,6 +880,10 @@ def main():
     logger.info("Starting MCP server")
     logger.info("Bastion connections will be managed automatically and run independently")
     
+    # Warm up tunnel and connections while the MCP handshake completes
+    if os.getenv('PG_WARMUP', 'true').lower() in ('1', 'true', 'yes'):
+        threading.Thread(target=warmup, args=(timings,), name="pg-warmup", daemon=True).start()
+    
     try:
         mcp.run()
     except Exception as e:
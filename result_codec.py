@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""Compact columnar encoding for query results
+
+Results are encoded as JSON with a header (success, result type, error,
+queue time, column schema) and one array per column, optionally
+zlib-compressed and base64-wrapped so they fit in a text tool response.
+Dates, timestamps and UUIDs use compact numeric/base64 forms and the output
+is strict JSON, so non-Python callers can decode it too. Only the standard
+library is used, so programmatic callers can import decode_result without
+pulling in the MCP server dependencies.
+"""
+
+import base64
+import datetime
+import decimal
+import json
+import math
+import uuid
+import zlib
+from typing import Any, Dict, List
+
+FORMAT_VERSION = 1
+COMPRESSED_PREFIX = "z1:"
+
+# PostgreSQL type OIDs (cursor.description type_code) to logical types
+PG_TYPES = {
+    16: "bool",
+    20: "int", 21: "int", 23: "int", 26: "int",
+    700: "float", 701: "float",
+    1021: "float_array", 1022: "float_array",
+    1700: "numeric",
+    1082: "date",
+    1083: "time",
+    1114: "timestamp",
+    1184: "timestamptz",
+    114: "json", 3802: "json",
+    2950: "uuid",
+    17: "bytea",
+}
+
+# Result fields copied into the payload header
+HEADER_FIELDS = ("success", "type", "error", "transient", "message", "operation",
+                 "affected_rows", "row_count", "queue_time", "attempts")
+
+# Types JSON represents natively; their columns are passed through as-is
+NATIVE_TYPES = {"bool", "int", "text", "json"}
+
+EPOCH = datetime.datetime(1970, 1, 1)
+EPOCH_UTC = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+EPOCH_ORDINAL = EPOCH.toordinal()
+MICROSECOND = datetime.timedelta(microseconds=1)
+
+def get_column_type(type_code: Any) -> str:
+    """Map a cursor type_code to a logical column type"""
+    return PG_TYPES.get(type_code, "text")
+
+def encode_value(value: Any) -> Any:
+    """Convert a value json.dumps cannot serialize to its string form"""
+    if isinstance(value, (bytes, memoryview)):
+        return base64.b64encode(bytes(value)).decode('ascii')
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    # Decimal, timedelta and anything else use their string form
+    return str(value)
+
+def encode_float(value: float) -> Any:
+    """Spell out non-finite floats, which strict JSON cannot represent"""
+    if math.isfinite(value):
+        return value
+    if math.isnan(value):
+        return "NaN"
+    return "Infinity" if value > 0 else "-Infinity"
+
+def sanitize_floats(value: Any) -> Any:
+    """Recursively spell out non-finite floats inside lists and dicts"""
+    if isinstance(value, float):
+        return encode_float(value)
+    if isinstance(value, list):
+        return [sanitize_floats(item) for item in value]
+    if isinstance(value, dict):
+        return {key: sanitize_floats(item) for key, item in value.items()}
+    return value
+
+def restore_floats(value: Any) -> Any:
+    """Reverse sanitize_floats for (possibly nested) float arrays"""
+    if isinstance(value, str):
+        return float(value)
+    if isinstance(value, list):
+        return [restore_floats(item) for item in value]
+    return value
+
+def encode_column(values: List[Any], col_type: str) -> List[Any]:
+    """Convert one column to its JSON form in a single typed pass"""
+    if col_type in NATIVE_TYPES:
+        return values
+    if col_type == "float":
+        return [value if value is None else encode_float(value) for value in values]
+    if col_type == "float_array":
+        return [sanitize_floats(value) for value in values]
+    if col_type == "numeric":
+        return [value if value is None else str(value) for value in values]
+    if col_type == "timestamp":
+        # Microseconds since the epoch
+        return [value if value is None else (value - EPOCH) // MICROSECOND for value in values]
+    if col_type == "timestamptz":
+        return [value if value is None else (value - EPOCH_UTC) // MICROSECOND for value in values]
+    if col_type == "date":
+        # Days since the epoch
+        return [value if value is None else value.toordinal() - EPOCH_ORDINAL for value in values]
+    if col_type == "uuid":
+        # 16 bytes as unpadded url-safe base64 (22 characters)
+        return [value if value is None else base64.urlsafe_b64encode(value.bytes)[:22].decode('ascii')
+                for value in values]
+    return [value if value is None else encode_value(value) for value in values]
+
+def decode_column(values: List[Any], col_type: str) -> List[Any]:
+    """Convert one JSON column back to Python values"""
+    if col_type in NATIVE_TYPES:
+        return values
+    if col_type == "float":
+        return [float(value) if isinstance(value, str) else value for value in values]
+    if col_type == "float_array":
+        return [restore_floats(value) for value in values]
+    if col_type == "numeric":
+        return [value if value is None else decimal.Decimal(value) for value in values]
+    if col_type == "timestamp":
+        return [value if value is None else EPOCH + value * MICROSECOND for value in values]
+    if col_type == "timestamptz":
+        return [value if value is None else EPOCH_UTC + value * MICROSECOND for value in values]
+    if col_type == "date":
+        return [value if value is None else datetime.date.fromordinal(value + EPOCH_ORDINAL) for value in values]
+    if col_type == "time":
+        return [value if value is None else datetime.time.fromisoformat(value) for value in values]
+    if col_type == "uuid":
+        return [value if value is None else uuid.UUID(bytes=base64.urlsafe_b64decode(value + "=="))
+                for value in values]
+    if col_type == "bytea":
+        return [value if value is None else base64.b64decode(value) for value in values]
+    return values
+
+def encode_result(result: Dict[str, Any], compress: bool = False) -> str:
+    """Encode a query result as a header plus column-oriented arrays
+
+    Args:
+        result: Result dict from execute_postgresql_query; select results
+            contribute "columns", "types" and "rows", every result
+            contributes its status fields (see HEADER_FIELDS)
+        compress: zlib-compress and base64-wrap the payload
+
+    Returns:
+        Encoded payload string
+    """
+    envelope = {"v": FORMAT_VERSION}
+    envelope.update({field: result[field] for field in HEADER_FIELDS if field in result})
+
+    if result.get("type") == "select":
+        columns, types, rows = result["columns"], result["types"], result["rows"]
+        data = [list(values) for values in zip(*rows)] if rows else [[] for _ in columns]
+        envelope["columns"] = [{"name": name, "type": col_type} for name, col_type in zip(columns, types)]
+        envelope["data"] = [encode_column(values, col_type) for values, col_type in zip(data, types)]
+
+    # encode_value only catches stray values in text columns (intervals, ranges, ...)
+    try:
+        payload = json.dumps(envelope, separators=(',', ':'), ensure_ascii=False,
+                             allow_nan=False, default=encode_value)
+    except ValueError:
+        # Non-finite floats nested in text/json values (other arrays, jsonb holding 1e400, ...);
+        # rare, so only then pay for a recursive pass. They stay strings after decoding.
+        payload = json.dumps(sanitize_floats(envelope), separators=(',', ':'), ensure_ascii=False,
+                             allow_nan=False, default=encode_value)
+
+    if compress:
+        # Level 1 gets nearly the same ratio on result data at a fraction of the cost
+        return COMPRESSED_PREFIX + base64.b64encode(zlib.compress(payload.encode('utf-8'), 1)).decode('ascii')
+    return payload
+
+def decode_result(payload: str) -> Dict[str, Any]:
+    """Decode a payload produced by encode_result
+
+    Returns:
+        Dict with the header fields plus "columns", "types" and "rows"
+        (list of tuples with values restored to their Python types; empty
+        for errors and non-select results)
+    """
+    if payload.startswith(COMPRESSED_PREFIX):
+        payload = zlib.decompress(base64.b64decode(payload[len(COMPRESSED_PREFIX):])).decode('utf-8')
+
+    envelope = json.loads(payload)
+    if envelope.get("v") != FORMAT_VERSION:
+        raise ValueError(f"Unsupported result format version: {envelope.get('v')}")
+
+    result = {field: envelope[field] for field in HEADER_FIELDS if field in envelope}
+    columns: List[str] = [col["name"] for col in envelope.get("columns", [])]
+    types: List[str] = [col["type"] for col in envelope.get("columns", [])]
+    data = [decode_column(values, col_type) for values, col_type in zip(envelope.get("data", []), types)]
+    if data:
+        rows = list(zip(*data))
+    elif envelope.get("type") == "select":
+        # A zero-column select (SELECT FROM t) still returns rows
+        rows = [()] * envelope.get("row_count", 0)
+    else:
+        rows = []
+    result.update({"columns": columns, "types": types, "rows": rows})
+    return result
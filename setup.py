@@ -61,6 +61,16 @@ def setup_mcp_config():
         "PGUSER": os.getenv("PGUSER", "postgres"),
         "PGPASSWORD": os.getenv("PGPASSWORD", "your_password_here"),
         "PGDATABASE": os.getenv("PGDATABASE", "postgres"),
+        "PG_RETRY_MAX": os.getenv("PG_RETRY_MAX", "3"),
+        "PG_RETRY_BASE_DELAY": os.getenv("PG_RETRY_BASE_DELAY", "0.2"),
+        "PG_RETRY_MAX_DELAY": os.getenv("PG_RETRY_MAX_DELAY", "2.0"),
+        "PG_POOL_MIN": os.getenv("PG_POOL_MIN", "1"),
+        "PG_POOL_MAX": os.getenv("PG_POOL_MAX", "10"),
+        "PG_WARMUP": os.getenv("PG_WARMUP", "true"),
+        "PG_MAX_CONCURRENCY": os.getenv("PG_MAX_CONCURRENCY", "5"),
+        "PG_RATE_LIMIT": os.getenv("PG_RATE_LIMIT", "5"),
+        "PG_RATE_BURST": os.getenv("PG_RATE_BURST", "20"),
+        "PG_QUEUE_TIMEOUT": os.getenv("PG_QUEUE_TIMEOUT", "30"),
         "LOG_LEVEL": os.getenv("LOG_LEVEL", "INFO"),
         "LOG_FILE": str(project_root / os.getenv("LOG_FILE", "pg_mcp.log"))
     }